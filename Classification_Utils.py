@@ -262,6 +262,7 @@ def combine_csvs(file_dir, file_names):
     combined_df = pd.DataFrame()
     for df in dfs:
         df.set_index('Peptide', inplace=True)
+        df = df.astype(np.float32) # abundances carry ~6 significant digits; float32 halves memory for every later step
         combined_df = combined_df.join(df, how='outer')
         
     return combined_df
@@ -283,9 +284,10 @@ Returns:
 """
 def rename_columns(df, before, after):
     columns = df.columns.values.tolist()
+    pattern = re.compile(before) # compile once rather than looking the pattern up for every column
     new_columns = []
     for column in columns:
-        new_column = re.sub(before, after, column)
+        new_column = pattern.sub(after, column)
         new_columns.append(new_column)
         
     return new_columns
@@ -300,11 +302,12 @@ Returns:
     List of strings representing the labels for each dataframe column
 """
 def get_labels(columns, organ_to_columns):
-    labels = []
+    column_to_organ = {} # build the reverse lookup once instead of searching every organ's list per column
+    for key, value in organ_to_columns.items():
+        for column in value:
+            column_to_organ.setdefault(column, key)
 
-    for column in columns:
-        key = next(key for key, value in organ_to_columns.items() if column in value)
-        labels.append(key)
+    labels = [column_to_organ[column] for column in columns]
         
     return labels
 
@@ -321,18 +324,16 @@ Returns:
     df filtered to only contain peptides present in at least min_samples samples of a single tissue, for a number of tissues specified by min_tissues and max_tissues
 """
 def filter_peptides_by_samples_and_tissues(df, min_samples, min_tissues, max_tissues, tissues, imputed_val):
-    df_cols = df.columns.values.tolist()
+    observed = df.values != imputed_val # compare once, then slice per tissue
     organ_counts = {}
     
     for tissue in tissues:
-        cols = [col for col in df_cols if col.startswith(tissue)] # Get corresponding list of column names
-        organ_counts[tissue] = (df[cols] != imputed_val).sum(1) # count number of samples with non-imputed abundance for each protein
+        cols = np.flatnonzero(df.columns.str.startswith(tissue)) # Get positions of corresponding columns
+        organ_counts[tissue] = observed[:, cols].sum(axis=1) # count number of samples with non-imputed abundance for each protein
 
-    tallys = 1 * (organ_counts[tissues[0]] >= min_samples)
-    for t in tissues[1:]:
-        tallys += 1 * (organ_counts[t] >= min_samples)
+    tallys = np.sum([organ_counts[t] >= min_samples for t in tissues], axis=0)
 
-    new_df = df[(tallys >= min_tissues) & (tallys <= max_tissues)]
+    new_df = df.iloc[(tallys >= min_tissues) & (tallys <= max_tissues)]
     return new_df
 
 """
@@ -381,13 +382,15 @@ def fit_new_data(original_df, new_df, features_to_keep=None):
 
     fitted_data = original_df.join(new_df)
     
-    fitted_data.iloc[:,:] = np.log2(fitted_data.iloc[:,:])
-    fitted_data.replace([np.inf, -np.inf], np.nan, inplace=True)
+    quants = fitted_data.to_numpy(dtype=np.float64) # float copy, so integer or mixed float32/float64 input is handled
+    fitted_data = pd.DataFrame(np.log2(quants, out=np.full_like(quants, np.nan), where=quants > 0), # zeros become NaN rather than -inf
+                               index=fitted_data.index, columns=fitted_data.columns)
     
-    fitted_data = fitted_data.fillna(fitted_data.min().min()/2)
+    fitted_data.fillna(np.nanmin(fitted_data.values)/2, inplace=True) # fitted_data is a fresh join result, so no copy is needed
     
-    median_of_medians = fitted_data.median().median()
-    fitted_data /= fitted_data.median(axis=0) # divide each value by sample median
+    sample_medians = np.median(fitted_data.values, axis=0)
+    median_of_medians = np.median(sample_medians)
+    fitted_data /= sample_medians # divide each value by sample median
     fitted_data *= median_of_medians
     
     fitted_data.drop(original_df.columns, axis=1, inplace=True)
@@ -404,7 +407,7 @@ Transforms dataframe values to 0 or 1 to represent presence/absence
 """
 def abundance_to_binary(df):
     mode = df.mode().iloc[0,0]
-    df = df.applymap(lambda x: 0 if x==mode else 1)
+    df = (df != mode).astype(int) # vectorized comparison instead of a per-cell Python call
     return df
 
 #########################
@@ -424,13 +427,11 @@ Returns:
 """
 def map_tissues_to_columns(df, list_of_tissues):
     
-    tissues_to_columns = dict([(key, []) for key in list_of_tissues])
+    tissues_to_columns = {}
 
-    for column_name in df.columns.values.tolist():
-        for tissue in list_of_tissues:
-            if tissue in column_name:
-                tissues_to_columns[tissue].append(column_name)
-                continue
+    for tissue in list_of_tissues:
+        cols = df.columns.str.contains(tissue, regex=False) # literal substring match, no regex engine
+        tissues_to_columns[tissue] = df.columns[cols].tolist()
                 
     return tissues_to_columns
 
@@ -515,7 +516,7 @@ def get_descending_abundances(df, labels):
     labelled_df.columns = labels
     
     label_to_proteins = {} # {label: list of proteins}
-    for label in labels:
+    for label in labelled_df.columns.unique(): # sort each label's proteins once, not once per column
         sub_df = labelled_df[label]
         sorted_proteins = sub_df.mean(axis=1).sort_values(ascending=False)
         label_to_proteins[label] = sorted_proteins.index.values
@@ -23,33 +23,30 @@ def combine_csvs(file_dir, file_paths):
     combined_df = pd.DataFrame()
     for df in dfs:
         df.set_index('Peptide', inplace=True)
+        df = df.astype(np.float32) # abundances carry ~6 significant digits; float32 halves memory for every later step
         combined_df = combined_df.join(df, how='outer')
         
     return combined_df
 
 def filter_peptides_by_samples_and_tissues(df, min_samples, min_tissues, max_tissues, tissues, missing_val):
-    df_cols = df.columns.values.tolist()
+    observed = df.values != missing_val # compare once, then slice per tissue
     counts = {}
     
     for tissue in tissues:
-        cols = [col for col in df_cols if tissue in col] # Get corresponding list of column names
-        counts[tissue] = (df[cols] != missing_val).sum(1) # count number of samples with non-imputed abundance for each protein
+        cols = np.flatnonzero(df.columns.str.contains(tissue, regex=False)) # Get positions of corresponding columns
+        counts[tissue] = observed[:, cols].sum(axis=1) # count number of samples with non-imputed abundance for each protein
         
-    tallys = 1 * (counts[tissues[0]] >= min_samples)
-    for t in tissues[1:]:
-        tallys += 1 * (counts[t] >= min_samples)
+    tallys = np.sum([counts[t] >= min_samples for t in tissues], axis=0)
 
-    new_df = df[(tallys >= min_tissues) & (tallys <= max_tissues)]
+    new_df = df.iloc[(tallys >= min_tissues) & (tallys <= max_tissues)]
     return new_df
 
 def map_tissues_to_columns(df, list_of_tissues):
-    tissues_to_columns = dict([(key, []) for key in list_of_tissues])
+    tissues_to_columns = {}
 
-    for column_name in df.columns.values.tolist():
-        for tissue in list_of_tissues:
-            if tissue in column_name:
-                tissues_to_columns[tissue].append(column_name)
-                continue
+    for tissue in list_of_tissues:
+        cols = df.columns.str.contains(tissue, regex=False) # literal substring match, no regex engine
+        tissues_to_columns[tissue] = df.columns[cols].tolist()
                 
     return tissues_to_columns
 
@@ -65,13 +62,16 @@ if '\n' in df.index:
     df = df.drop(['\n']) # drop extra newline characters in index
 
 ### Transform and Normalize
-df.iloc[:,:] = np.log2(df.iloc[:,:]) # log2 transform
-df.replace([-np.inf], np.nan, inplace=True) # log2(0) returns -inf; replace with NaN to avoid skewing data
+quants = df.values
+observed = quants > 0 # log2(0) returns -inf, so zeros are treated as missing along with NaN to avoid skewing data
 
 # Impute missing values as half the minimum value
-df_min = df.min().min()
+# log2 is monotonic, so the minimum log2 value is the log2 of the minimum observed abundance
+df_min = np.log2(quants[observed].min())
 impute_val = df_min/2
-df = df.fillna(impute_val)
+
+# log2 transform observed values; missing values are filled with impute_val in the same pass
+df.iloc[:,:] = np.log2(quants, out=np.full_like(quants, impute_val), where=observed)
 
 tissues = ast.literal_eval(sys.argv[2]) if len(sys.argv) > 2 else['Blood_Plasma', 'Blood_Serum', 'CSF', 'Liver', 'Monocyte', 'Ovary', 'Pancreas', 'Substantia_Nigra', 'Temporal_Lobe']
 
@@ -81,8 +81,9 @@ tissues_to_columns = map_tissues_to_columns(df, tissues)
 df = filter_peptides_by_samples_and_tissues(df, min_samples=5, min_tissues=1, max_tissues=len(tissues), 
                                             tissues=tissues, missing_val=impute_val)
 
-median_of_medians = df.median().median()
-df /= df.median(axis=0) # divide each value by sample median
+sample_medians = np.median(df.values, axis=0) # no missing values remain after imputation
+median_of_medians = np.median(sample_medians)
+df /= sample_medians # divide each value by sample median
 df *= median_of_medians # multiply each value by the median of medians
 
 result_name = sys.argv[3] if len(sys.argv) > 3 else 'FullPeptideQuant.txt'